@@ -76,7 +76,7 @@ set "PIP=%PY% -m pip"
 
 :: Ensure dependencies (PyInstaller plus runtime libs)
 echo Installing build dependencies...
-%PIP% install --upgrade pyinstaller yt-dlp rich >nul
+%PIP% install --upgrade pyinstaller yt-dlp rich diskcache aiomultiprocess >nul
 if errorlevel 1 (
     echo [ERROR] Failed to install dependencies.
     pause
@@ -0,0 +1,17 @@
+"""
+Thread pool for blocking yt-dlp calls.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+# yt-dlp work is IO-bound, so allow more threads than asyncio's default pool
+MAX_WORKERS = 32
+
+
+def create_executor(max_workers: int = MAX_WORKERS) -> ThreadPoolExecutor:
+    """Create a thread pool for extractor calls."""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ytdl')
+
+
+# Shared by every extractor unless one asks for its own pool
+EXECUTOR = create_executor()
@@ -5,14 +5,48 @@ Base extractor with common functionality for all video sites.
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, Callable
 import asyncio
+import os
 import random
+import re
+import shutil
+import sys
+from types import MappingProxyType
 import yt_dlp
 
+from ._executor import EXECUTOR, create_executor
+
+# aria2c opens several connections per file, avoiding per-connection throttling
+ARIA2C_PATH = shutil.which('aria2c')
+ARIA2C_ARGS = ['-x', '16', '-s', '16', '-k', '1M', '--file-allocation=none']
+
+
+def _user_cache_dir() -> str:
+    """Per-user cache directory for this app."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'yt_tui')
+
+
+# yt-dlp keeps the extracted player signature functions here between runs
+YTDLP_CACHE_DIR = os.path.join(_user_cache_dir(), 'ytdlp')
+try:
+    os.makedirs(YTDLP_CACHE_DIR, exist_ok=True)
+except OSError:
+    pass
+
 
 class BaseExtractor(ABC):
     """Abstract base class for all extractors with common utilities."""
 
     HOST = ""  # Override in subclass
+
+    # Characters stripped from titles when building filenames
+    _UNSAFE_FILENAME_RE = re.compile(r'[^\w .\-]+')
+
+    # Errors where retrying won't help: access denied or video doesn't exist
+    _FATAL_ERROR_RE = re.compile(r'\b(?:403|forbidden|404|not found)\b', re.IGNORECASE)
     
     # User agents for rotation
     USER_AGENTS = [
@@ -24,6 +58,65 @@ class BaseExtractor(ABC):
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36 Edg/122.0.0.0',
     ]
 
+    # Base yt-dlp options, built once. Nested values are shared: copy before changing them.
+    _BASE_OPTS = MappingProxyType({
+        'quiet': True,
+        'no_warnings': True,
+        'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+        'merge_output_format': 'mp4',
+        # Network robustness
+        'socket_timeout': 30,
+        'retries': 5,
+        'fragment_retries': 5,
+        'extractor_retries': 3,
+        'file_access_retries': 3,
+        # Reuse decoded player signatures across runs
+        'cachedir': YTDLP_CACHE_DIR,
+        # Bypass common restrictions
+        'nocheckcertificate': True,
+        'geo_bypass': True,
+        'geo_bypass_country': 'US',
+        # Prevent hanging
+        'sleep_interval': 0,
+        'max_sleep_interval': 0,
+        'sleep_interval_requests': 0,
+        # Don't check formats (faster, more compatible)
+        'no_check_formats': True,
+        # Only register YouTube's extractors (plus generic) instead of all ~1800;
+        # entries are regexes fullmatched against lowercased extractor names, and
+        # not all of YouTube's use the 'youtube:' prefix (e.g. youtubeytbe)
+        'allowed_extractors': ['youtube.*', 'generic'],
+        # Default extractor args for YouTube compatibility
+        'extractor_args': {
+            'youtube': {
+                'player_client': ['default'],
+            }
+        },
+    })
+
+    # Extra options for downloads
+    _DOWNLOAD_OPTS = MappingProxyType({
+        'writeinfojson': False,
+        'writesubtitles': False,
+        'writeautomaticsub': False,
+        'http_chunk_size': 4194304,  # 4MB chunks
+        'concurrent_fragment_downloads': 16,
+        **({
+            'external_downloader': {'default': ARIA2C_PATH},
+            'external_downloader_args': {'aria2c': ARIA2C_ARGS},
+        } if ARIA2C_PATH else {}),
+    })
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Size of a dedicated thread pool for this extractor's
+                blocking yt-dlp calls. By default the shared pool is used.
+        """
+        self._executor = create_executor(max_workers) if max_workers else EXECUTOR
+        # Own generator for backoff jitter so retries don't touch the global one
+        self._rng = random.Random(id(self))
+
     def can_extract(self, url: str) -> bool:
         """Check if this extractor can handle the given URL."""
         return self.HOST in url
@@ -34,50 +127,15 @@ class BaseExtractor(ABC):
 
     def _get_base_opts(self, for_download: bool = False) -> dict:
         """Get base yt-dlp options with good defaults."""
-        opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-            'merge_output_format': 'mp4',
-            # Network robustness
-            'socket_timeout': 30,
-            'retries': 5,
-            'fragment_retries': 5,
-            'extractor_retries': 3,
-            'file_access_retries': 3,
-            # Bypass common restrictions
-            'nocheckcertificate': True,
-            'geo_bypass': True,
-            'geo_bypass_country': 'US',
-            # Prevent hanging
-            'sleep_interval': 0,
-            'max_sleep_interval': 0,
-            'sleep_interval_requests': 0,
-            # Don't check formats (faster, more compatible)
-            'no_check_formats': True,
-            # Default extractor args for YouTube compatibility
-            'extractor_args': {
-                'youtube': {
-                    'player_client': ['default'],
-                }
-            },
-        }
-        
+        opts = dict(self._BASE_OPTS)
         if for_download:
-            opts.update({
-                'writeinfojson': False,
-                'writesubtitles': False,
-                'writeautomaticsub': False,
-                'http_chunk_size': 10485760,  # 10MB chunks
-                'concurrent_fragment_downloads': 4,
-            })
-        
+            opts.update(self._DOWNLOAD_OPTS)
         return opts
 
     async def _run_in_executor(self, func):
-        """Run a blocking function in a thread executor."""
+        """Run a blocking function in the extractor's thread pool."""
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, func)
+        return await loop.run_in_executor(self._executor, func)
 
     async def _with_timeout(self, coro, timeout_seconds: int = 300):
         """Run a coroutine with a timeout."""
@@ -95,16 +153,13 @@ class BaseExtractor(ABC):
                 return await operation()
             except Exception as e:
                 last_exception = e
-                error_str = str(e).lower()
                 
                 # Don't retry on certain errors
-                if '403' in error_str or 'forbidden' in error_str:
-                    raise  # Access denied - retrying won't help
-                if 'not found' in error_str or '404' in error_str:
-                    raise  # Video doesn't exist
+                if self._FATAL_ERROR_RE.search(str(e)):
+                    raise
                 
                 if attempt < max_retries - 1:
-                    wait_time = delay * (attempt + 1) + random.uniform(0, 1)
+                    wait_time = delay * (attempt + 1) + self._rng.uniform(0, 1)
                     await asyncio.sleep(wait_time)
         
         raise last_exception
@@ -114,7 +169,7 @@ class BaseExtractor(ABC):
         if output_path and '%(title)s' in output_path:
             title = info.get('title', 'video')
             # Sanitize title for filename
-            title = "".join(c for c in title if c.isalnum() or c in ' ._-')[:100]
+            title = self._UNSAFE_FILENAME_RE.sub('', title)[:100]
             ext = info.get('ext', 'mp4')
             return output_path.replace('%(title)s', title).replace('%(ext)s', ext)
         elif output_path:
@@ -3,10 +3,43 @@ YouTube-only extractor module.
 """
 
 from .base import BaseExtractor
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+import atexit
+import copy
+import os
+import re
+import tempfile
+import threading
+import time
+from types import MappingProxyType
 import yt_dlp
 import asyncio
 
+try:
+    from diskcache import Cache
+except ImportError:  # Optional: without it metadata is only cached in memory
+    Cache = None
+
+
+# Metadata survives restarts for a day so recent links preview instantly
+METADATA_CACHE_DIR = os.path.join(tempfile.gettempdir(), "yt_tui_meta")
+METADATA_CACHE_TTL = 86400
+METADATA_CACHE_TAG = 'yt_info'
+
+try:
+    METADATA_CACHE = Cache(METADATA_CACHE_DIR) if Cache else None
+except Exception:
+    METADATA_CACHE = None
+
+
+def _hashable(value):
+    """Turn a (nested) yt-dlp option value into something usable as a dict key."""
+    if isinstance(value, dict):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
 
 class YouTubeExtractor(BaseExtractor):
     """
@@ -15,46 +48,220 @@ class YouTubeExtractor(BaseExtractor):
     """
     
     HOST = "youtube.com"
+
+    _URL_RE = re.compile(r'youtube\.com|youtu\.be', re.IGNORECASE)
+
+    # Canonical 11-character video ID from watch, short-link, shorts, live and embed URLs.
+    # The ID must end there, and playlist embeds (/embed/videoseries) don't count.
+    _VIDEO_ID_RE = re.compile(
+        r'(?:[?&]v=|youtu\.be/|/shorts/|/live/|/embed/(?!videoseries))([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])'
+    )
+
+    # How long fetched metadata is reused before hitting YouTube again
+    INFO_CACHE_TTL = 600
+
+    # YouTube overrides on top of the base options
+    _YOUTUBE_OPTS = MappingProxyType({
+        # YouTube-specific format selection with flexible fallbacks
+        'format': 'bestvideo[height<=1080]+bestaudio/best[height<=1080]/best',
+        # Handle age-restricted content
+        'age_limit': None,
+        # Don't download playlists unless explicitly requested
+        'noplaylist': True,
+        # Extract flat playlist info quickly
+        'extract_flat': False,
+        # Merge video+audio into mp4
+        'merge_output_format': 'mp4',
+    })
+
+    _YOUTUBE_DOWNLOAD_OPTS = MappingProxyType({
+        # Post-processing for best quality
+        'postprocessors': [{
+            'key': 'FFmpegVideoConvertor',
+            'preferedformat': 'mp4',
+        }],
+    })
+
+    def __init__(self, max_workers: Optional[int] = None):
+        super().__init__(max_workers)
+        # Full option sets for metadata and download calls, built once through
+        # _get_base_opts so subclass overrides still apply
+        self._info_template = MappingProxyType({
+            **self._get_base_opts(for_download=False),
+            **self._YOUTUBE_OPTS,
+        })
+        self._download_template = MappingProxyType({
+            **self._get_base_opts(for_download=True),
+            **self._YOUTUBE_OPTS,
+            **self._YOUTUBE_DOWNLOAD_OPTS,
+        })
+        self._info_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Final file written for each video ID, reported by yt-dlp's hooks
+        self._downloaded_paths: Dict[str, str] = {}
+        # YoutubeDL instances are costly to build and not thread-safe, so keep
+        # one per (executor thread, options) and reuse it
+        self._ydl_cache: Dict[Tuple[int, frozenset], yt_dlp.YoutubeDL] = {}
+        self._ydl_lock = threading.Lock()
+        atexit.register(self._close_ydls)
     
     def can_extract(self, url: str) -> bool:
         """Handle youtube.com and youtu.be URLs."""
-        return 'youtube.com' in url or 'youtu.be' in url
+        return self._URL_RE.search(url) is not None
+
+    def _video_id(self, url: str) -> Optional[str]:
+        """Get the canonical video ID from a URL, if it has one."""
+        match = self._VIDEO_ID_RE.search(url)
+        return match.group(1) if match else None
+
+    def canonical_url(self, url: str) -> Optional[str]:
+        """Plain watch URL for the video a link points at, or None if it has no video ID."""
+        video_id = self._video_id(url)
+        return f"https://www.youtube.com/watch?v={video_id}" if video_id else None
+
+    def _get_cached_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return cached metadata for the URL if it hasn't expired."""
+        video_id = self._video_id(url)
+        entry = self._info_cache.get(video_id) if video_id else None
+        if entry is None:
+            return None
+        stored_at, info = entry
+        if time.monotonic() - stored_at > self.INFO_CACHE_TTL:
+            del self._info_cache[video_id]
+            return None
+        return info
+
+    def _get_disk_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return metadata saved by a previous session, if any."""
+        video_id = self._video_id(url)
+        if METADATA_CACHE is None or not video_id:
+            return None
+        try:
+            return METADATA_CACHE.get(video_id)
+        except Exception:
+            return None
+
+    def _store_info(self, url: str, info: Dict[str, Any], persist: bool = True):
+        """Remember metadata for the URL's video ID."""
+        video_id = self._video_id(url) or (info or {}).get('id')
+        if not video_id or not info:
+            return
+        self._info_cache[video_id] = (time.monotonic(), info)
+        if persist and METADATA_CACHE is not None:
+            try:
+                # Only keep plain data on disk so the entry always unpickles
+                stored = yt_dlp.YoutubeDL.sanitize_info(info)
+                stored.pop('http_headers', None)
+                stored.pop('formats_sort_fields', None)
+                METADATA_CACHE.set(video_id, stored, expire=METADATA_CACHE_TTL,
+                                   tag=METADATA_CACHE_TAG)
+            except Exception:
+                pass
+
+    def invalidate(self, url: str):
+        """Forget cached metadata for a URL (e.g. after a failed download)."""
+        video_id = self._video_id(url)
+        if video_id:
+            self._info_cache.pop(video_id, None)
+            if METADATA_CACHE is not None:
+                try:
+                    METADATA_CACHE.delete(video_id)
+                except Exception:
+                    pass
+
+    def clear_cache(self) -> int:
+        """Drop all cached metadata. Returns the number of entries removed from disk."""
+        self._info_cache.clear()
+        if METADATA_CACHE is None:
+            return 0
+        try:
+            return METADATA_CACHE.evict(METADATA_CACHE_TAG)
+        except Exception:
+            return 0
+
+    def _get_ydl(self, opts: dict) -> yt_dlp.YoutubeDL:
+        """Get a reusable YoutubeDL for these options. Call from the worker thread."""
+        key = (threading.get_ident(), frozenset((k, _hashable(v)) for k, v in opts.items()))
+        with self._ydl_lock:
+            ydl = self._ydl_cache.get(key)
+            if ydl is None:
+                ydl = self._ydl_cache[key] = yt_dlp.YoutubeDL(opts)
+        return ydl
+
+    def _close_ydls(self):
+        """Close all cached YoutubeDL instances."""
+        with self._ydl_lock:
+            ydls = list(self._ydl_cache.values())
+            self._ydl_cache.clear()
+        for ydl in ydls:
+            try:
+                ydl.close()
+            except Exception:
+                pass
+
+    def _record_path(self, info: Optional[Dict[str, Any]], path: Optional[str]):
+        video_id = (info or {}).get('id')
+        if video_id and path:
+            self._downloaded_paths[video_id] = path
+
+    def _progress_hook(self, d: dict):
+        """Remember the file yt-dlp just finished downloading."""
+        if d.get('status') == 'finished':
+            self._record_path(d.get('info_dict'), d.get('filename'))
+
+    def _postprocessor_hook(self, d: dict):
+        """Remember the final file once merging/conversion is done."""
+        if d.get('status') == 'finished':
+            info = d.get('info_dict') or {}
+            self._record_path(info, info.get('filepath'))
 
     def _get_ydl_opts(self, for_download: bool = False) -> dict:
-        opts = self._get_base_opts(for_download)
-        
-        opts.update({
-            # YouTube-specific format selection with flexible fallbacks
-            'format': 'bestvideo[height<=1080]+bestaudio/best[height<=1080]/best',
-            # Handle age-restricted content
-            'age_limit': None,
-            # Don't download playlists unless explicitly requested
-            'noplaylist': True,
-            # Extract flat playlist info quickly
-            'extract_flat': False,
-            # Merge video+audio into mp4
-            'merge_output_format': 'mp4',
-        })
-        
-        if for_download:
-            opts.update({
-                # Post-processing for best quality
-                'postprocessors': [{
-                    'key': 'FFmpegVideoConvertor',
-                    'preferedformat': 'mp4',
-                }],
-            })
-        
-        return opts
+        return dict(self._download_template if for_download else self._info_template)
 
     async def extract_info(self, url: str) -> Dict[str, Any]:
+        cached = self._get_cached_info(url)
+        if cached is not None:
+            # Hand out a copy so callers can't mutate the cached entry
+            return copy.deepcopy(cached)
+
+        cached = self._get_disk_info(url)
+        if cached is not None:
+            self._store_info(url, cached, persist=False)
+            return copy.deepcopy(cached)
+
         async def _extract():
             opts = self._get_ydl_opts(for_download=False)
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                return await self._run_in_executor(
-                    lambda: ydl.extract_info(url, download=False)
-                )
-        return await self._retry(_extract, max_retries=3)
+            return await self._run_in_executor(
+                lambda: self._get_ydl(opts).extract_info(url, download=False)
+            )
+        info = await self._retry(_extract, max_retries=3)
+        self._store_info(url, info)
+        return copy.deepcopy(info)
+
+    async def extract_playlist_flat(self, url: str) -> List[Dict[str, Any]]:
+        """
+        List a playlist's videos (ID, title, duration) from a single page fetch,
+        without extracting each video. Each entry's 'url' is a plain watch URL.
+        """
+        async def _extract():
+            opts = self._get_ydl_opts(for_download=False)
+            opts.update({
+                'noplaylist': False,
+                'extract_flat': 'in_playlist',
+                'skip_download': True,
+            })
+            return await self._run_in_executor(
+                lambda: self._get_ydl(opts).extract_info(url, download=False)
+            )
+        info = await self._retry(_extract, max_retries=3)
+        entries = []
+        for entry in info.get('entries') or []:
+            if not entry:
+                continue
+            if entry.get('id'):
+                entry['url'] = f"https://www.youtube.com/watch?v={entry['id']}"
+            if entry.get('url'):
+                entries.append(entry)
+        return entries
 
     async def download(self, url: str, format_id: str = "best", output_path: str = None) -> str:
         async def _download():
@@ -62,15 +269,18 @@ class YouTubeExtractor(BaseExtractor):
             if format_id != "best":
                 opts['format'] = format_id
             opts['outtmpl'] = output_path or '%(title)s.%(ext)s'
+            opts['progress_hooks'] = [self._progress_hook]
+            opts['postprocessor_hooks'] = [self._postprocessor_hook]
             
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = await self._run_in_executor(
-                    lambda: ydl.extract_info(url, download=False)
-                )
-                await self._with_timeout(
-                    self._run_in_executor(lambda: ydl.download([url])),
-                    timeout_seconds=600  # 10 min for YouTube
-                )
-            return self._get_filename(info, output_path)
+            self._downloaded_paths.pop(self._video_id(url), None)
+            # One call both fetches the metadata and downloads
+            info = await self._with_timeout(
+                self._run_in_executor(
+                    lambda: self._get_ydl(opts).extract_info(url, download=True)
+                ),
+                timeout_seconds=600  # 10 min for YouTube
+            )
+            path = self._downloaded_paths.pop(info.get('id'), None)
+            return path or self._get_filename(info, output_path)
         
-        return await self._retry(_download, max_retries=2)
+        return await self._retry(_download, max_retries=2)
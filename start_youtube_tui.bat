@@ -47,6 +47,18 @@ if errorlevel 1 (
     !PIP! install rich
 )
 
+!PIP! show diskcache >nul 2>&1
+if errorlevel 1 (
+    echo Installing diskcache ^(metadata cache^)...
+    !PIP! install diskcache
+)
+
+!PIP! show aiomultiprocess >nul 2>&1
+if errorlevel 1 (
+    echo Installing aiomultiprocess ^(parallel batch downloads^)...
+    !PIP! install aiomultiprocess
+)
+
 echo.
 echo All dependencies installed!
 echo.
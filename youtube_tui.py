@@ -7,7 +7,9 @@ Paste a YouTube link, pick a format, and save it locally.
 import os
 import sys
 import asyncio
+import heapq
 import json
+import multiprocessing
 from datetime import datetime
 
 # Windows-specific fixes
@@ -18,18 +20,22 @@ if sys.platform == 'win32':
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# rich.table is imported where tables are drawn to keep it off the startup path
 try:
     from rich.console import Console
     from rich.panel import Panel
     from rich.prompt import Prompt, Confirm
-    from rich.table import Table
 except ImportError:
     print("Installing rich library...")
     os.system(f"{sys.executable} -m pip install rich --quiet")
     from rich.console import Console
     from rich.panel import Panel
     from rich.prompt import Prompt, Confirm
-    from rich.table import Table
+
+try:
+    import aiomultiprocess
+except ImportError:  # Optional: batch downloads run in this process without it
+    aiomultiprocess = None
 
 from functions.extractors import YouTubeExtractor
 
@@ -47,20 +53,38 @@ SETTINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".yt_se
 
 YT_EXTRACTOR = YouTubeExtractor()
 
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mkv', '.m4a', '.mp3')
+
+# Shared session for preflight requests, created on first use so connections are reused
+AIOHTTP_SESSION = None
+
+# Parallel downloads in batch mode (worker processes when aiomultiprocess is installed)
+BATCH_WORKERS = min(4, os.cpu_count() or 1)
+
+
+# Settings are read from disk once, then served from memory
+_SETTINGS_CACHE = None
+
 
 def load_settings() -> dict:
     """Load saved settings from file."""
+    global _SETTINGS_CACHE
+    if _SETTINGS_CACHE is not None:
+        return _SETTINGS_CACHE
+    _SETTINGS_CACHE = {}
     try:
         if os.path.exists(SETTINGS_FILE):
             with open(SETTINGS_FILE, 'r') as f:
-                return json.load(f)
+                _SETTINGS_CACHE = json.load(f)
     except Exception:
         pass
-    return {}
+    return _SETTINGS_CACHE
 
 
 def save_settings(settings: dict):
     """Save settings to file."""
+    global _SETTINGS_CACHE
+    _SETTINGS_CACHE = settings
     try:
         with open(SETTINGS_FILE, 'w') as f:
             json.dump(settings, f)
@@ -98,29 +122,73 @@ def format_duration(seconds):
     return f"{secs}s"
 
 
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
 def format_size(bytes_size):
     """Format bytes to human readable size."""
     if not bytes_size:
         return "Unknown"
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if bytes_size < 1024:
-            return f"{bytes_size:.1f} {unit}"
-        bytes_size /= 1024
-    return f"{bytes_size:.1f} TB"
+    # Each unit is 2**10 times the previous one, so the bit length picks it directly
+    idx = min(4, max(0, (int(bytes_size).bit_length() - 1) // 10))
+    return f"{bytes_size / (1 << (idx * 10)):.1f} {SIZE_UNITS[idx]}"
 
 
 def get_video_files(directory: str) -> list:
-    """Get list of video/audio files in a directory."""
-    extensions = ('.mp4', '.webm', '.mkv', '.m4a', '.mp3')
+    """Get directory entries (with cached stat info) for video/audio files in a directory."""
     if not os.path.exists(directory):
         return []
-    return [f for f in os.listdir(directory) if f.lower().endswith(extensions)]
+    with os.scandir(directory) as entries:
+        return [e for e in entries if e.is_file() and e.name.lower().endswith(VIDEO_EXTENSIONS)]
 
 
 def is_youtube_url(url: str) -> bool:
     """Basic YouTube URL check."""
-    check = url.lower()
-    return 'youtube.com' in check or 'youtu.be' in check
+    return YT_EXTRACTOR.can_extract(url)
+
+
+def is_playlist_url(url: str) -> bool:
+    """Check if the URL points at a playlist."""
+    return 'list=' in url
+
+
+def get_http_session():
+    """Get the shared aiohttp session (None if aiohttp isn't installed)."""
+    global AIOHTTP_SESSION
+    if AIOHTTP_SESSION is None:
+        # Imported here: it's slow to import and only needed for links without a video ID
+        try:
+            import aiohttp
+        except ImportError:  # Optional: such links are passed to yt-dlp as-is
+            return None
+        AIOHTTP_SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
+    return AIOHTTP_SESSION
+
+
+async def close_http_session():
+    """Close the shared aiohttp session if one was opened."""
+    global AIOHTTP_SESSION
+    if AIOHTTP_SESSION is not None:
+        await AIOHTTP_SESSION.close()
+        AIOHTTP_SESSION = None
+
+
+async def canonicalize(url: str) -> str:
+    """Turn a video link into a plain watch URL, following redirects if needed."""
+    canonical = YT_EXTRACTOR.canonical_url(url)
+    if canonical:
+        return canonical
+    session = get_http_session()
+    if session is None or is_playlist_url(url):
+        return url
+    try:
+        async with session.head(url, allow_redirects=True) as response:
+            return YT_EXTRACTOR.canonical_url(str(response.url)) or url
+    except Exception:
+        return url
 
 
 async def get_video_info(url: str):
@@ -138,29 +206,48 @@ async def download_video(url: str, output_dir: str, format_id: str = "best"):
         os.makedirs(output_dir, exist_ok=True)
         output_template = os.path.join(output_dir, '%(title)s.%(ext)s')
         try:
-            await YT_EXTRACTOR.download(url, format_id, output_template)
+            filepath = await YT_EXTRACTOR.download(url, format_id, output_template)
         except Exception as e:
             # If requested format is unavailable, fall back to best
             if format_id != "best" and "Requested format is not available" in str(e):
                 console.print("[yellow]Requested format not available, falling back to best...[/yellow]")
-                await YT_EXTRACTOR.download(url, "best", output_template)
-                format_id = "best"
+                filepath = await YT_EXTRACTOR.download(url, "best", output_template)
             else:
                 raise
 
-        # Find the downloaded file
-        files = get_video_files(output_dir)
-        if files:
-            files_with_time = [(f, os.path.getmtime(os.path.join(output_dir, f))) for f in files]
-            files_with_time.sort(key=lambda x: x[1], reverse=True)
-            return os.path.join(output_dir, files_with_time[0][0]), None
+        if filepath:
+            return filepath, None
         return None, "Download completed but file not found"
     except Exception as e:
+        # Don't let stale metadata (e.g. expired stream URLs) stick around
+        YT_EXTRACTOR.invalidate(url)
         return None, str(e)
 
 
+async def download_batch(urls: list, output_dir: str) -> list:
+    """Download several videos in parallel. Returns a (filepath, error) pair per URL."""
+    jobs = [(url, output_dir) for url in urls]
+    if aiomultiprocess is not None and len(jobs) > 1:
+        # Each worker process imports this module, so it gets its own event loop
+        # and YouTubeExtractor, and yt-dlp's pure-Python extraction isn't
+        # serialized by the GIL. One task per worker keeps at most BATCH_WORKERS
+        # downloads running, like the fallback below
+        async with aiomultiprocess.Pool(processes=min(BATCH_WORKERS, len(jobs)), childconcurrency=1) as pool:
+            return await pool.starmap(download_video, jobs)
+
+    sem = asyncio.Semaphore(BATCH_WORKERS)
+
+    async def one(url, directory):
+        async with sem:
+            return await download_video(url, directory)
+
+    return await asyncio.gather(*(one(url, directory) for url, directory in jobs))
+
+
 def display_video_info(info: dict):
     """Display video information in a nice table."""
+    from rich.table import Table
+
     table = Table(title="📋 Video Information", show_header=False, border_style="red")
     table.add_column("Property", style="bold yellow")
     table.add_column("Value", style="white")
@@ -180,68 +267,126 @@ def display_video_info(info: dict):
 
     # Show available resolutions
     formats = info.get('formats', [])
-    resolutions = set()
-    for fmt in formats:
-        if fmt.get('height'):
-            resolutions.add(fmt.get('height'))
+    resolutions = heapq.nlargest(6, {fmt['height'] for fmt in formats if fmt.get('height')})
     if resolutions:
-        res_str = ", ".join([f"{r}p" for r in sorted(resolutions, reverse=True)[:6]])
+        res_str = ", ".join([f"{r}p" for r in resolutions])
         table.add_row("Resolutions", res_str)
 
     console.print(table)
     console.print()
 
 
+def display_playlist_info(entries: list):
+    """Display the videos of a playlist in a table."""
+    from rich.table import Table
+
+    table = Table(title="📋 Playlist", show_header=True, border_style="red")
+    table.add_column("#", style="bold yellow", width=4)
+    table.add_column("Title", style="white")
+    table.add_column("Duration", style="cyan")
+
+    for i, entry in enumerate(entries, 1):
+        table.add_row(str(i), (entry.get('title') or 'Unknown')[:60], format_duration(entry.get('duration')))
+
+    console.print(table)
+    console.print()
+
+
+def parse_selection(choice: str, count: int) -> list:
+    """Parse a selection like '1,3,5-7', '5-' (to the end) or 'all' into 0-based indices."""
+    choice = choice.strip().lower()
+    if choice == 'all':
+        return list(range(count))
+    indices = []
+    for part in choice.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, dash, end = part.partition('-')
+        first = int(start)
+        if not dash:
+            last = first
+        else:
+            last = int(end) if end.strip() else count
+        if not 1 <= first <= last <= count:
+            raise ValueError(part)
+        indices.extend(range(first - 1, last))
+    return list(dict.fromkeys(indices))
+
+
+def select_playlist_entries(count: int) -> list:
+    """Let user pick videos from a playlist."""
+    while True:
+        choice = Prompt.ask("\n[bold]Videos to download[/bold] (e.g. 1,3,5-7, 5- or 'all')", default="all")
+        try:
+            indices = parse_selection(choice, count)
+            if indices:
+                return indices
+        except ValueError:
+            pass
+        console.print("[red]Invalid choice, try again[/red]")
+
+
+def display_batch_results(names: list, results: list):
+    """Display the outcome of a batch download."""
+    from rich.table import Table
+
+    table = Table(title="📥 Download Results", show_header=True, border_style="red")
+    table.add_column("#", style="bold yellow", width=3)
+    table.add_column("Video", style="white")
+    table.add_column("Result")
+
+    failed = 0
+    for i, (name, (filepath, error)) in enumerate(zip(names, results), 1):
+        if error:
+            failed += 1
+            table.add_row(str(i), name[:60], f"[red]❌ {error[:60]}[/red]")
+        else:
+            table.add_row(str(i), name[:60], f"[green]✅ {os.path.basename(filepath)[:60]}[/green]")
+
+    console.print(table)
+    console.print(f"\n[bold green]{len(results) - failed} downloaded[/bold green], [bold red]{failed} failed[/bold red]")
+
+
 def display_format_options(info: dict) -> list:
     """Display available format options from the actual video."""
     formats = info.get('formats', [])
     if not formats:
         return []
 
-    options = []
-    seen = set()
-    
-    # Collect unique video formats with height
-    video_formats = []
+    # Keep the best video format (highest fps, then bitrate) for each height
+    best_per_height = {}
     for fmt in formats:
         height = fmt.get('height')
-        vcodec = fmt.get('vcodec', 'none')
-        acodec = fmt.get('acodec', 'none')
-        if height and vcodec != 'none':
-            video_formats.append(fmt)
-    
-    # Sort by height descending
-    video_formats.sort(key=lambda x: x.get('height', 0) or 0, reverse=True)
-    
+        if height and fmt.get('vcodec', 'none') != 'none':
+            best = best_per_height.get(height)
+            if best is None or (fmt.get('fps') or 0, fmt.get('tbr') or 0) > (best.get('fps') or 0, best.get('tbr') or 0):
+                best_per_height[height] = fmt
+
     # Add best quality option first
-    options.append({
+    options = [{
         "id": "bestvideo+bestaudio/best",
         "desc": "Best quality (video + audio)",
         "resolution": "Best",
         "size": "",
         "type": "video+audio"
-    })
+    }]
     
-    # Add actual video resolutions from the video
-    for fmt in video_formats:
-        height = fmt.get('height')
-        if height and height not in seen:
-            seen.add(height)
-            filesize = fmt.get('filesize') or fmt.get('filesize_approx')
-            size_str = format_size(filesize) if filesize else "~"
-            fps = fmt.get('fps', '')
-            fps_str = f" {fps}fps" if fps and fps > 30 else ""
-            
-            options.append({
-                "id": f"bestvideo[height<={height}]+bestaudio/best[height<={height}]",
-                "desc": f"{height}p{fps_str}",
-                "resolution": f"{height}p",
-                "size": size_str,
-                "type": "video+audio"
-            })
-            
-            if len(seen) >= 6:  # Limit to 6 video options
-                break
+    # Add actual video resolutions from the video, limited to 6
+    for height in heapq.nlargest(6, best_per_height):
+        fmt = best_per_height[height]
+        filesize = fmt.get('filesize') or fmt.get('filesize_approx')
+        size_str = format_size(filesize) if filesize else "~"
+        fps = fmt.get('fps', '')
+        fps_str = f" {fps}fps" if fps and fps > 30 else ""
+        
+        options.append({
+            "id": f"bestvideo[height<={height}]+bestaudio/best[height<={height}]",
+            "desc": f"{height}p{fps_str}",
+            "resolution": f"{height}p",
+            "size": size_str,
+            "type": "video+audio"
+        })
     
     # Add audio-only option
     options.append({
@@ -254,6 +399,7 @@ def display_format_options(info: dict) -> list:
 
     console.print("\n[bold red]📦 Available formats from this video:[/bold red]")
 
+    from rich.table import Table
     table = Table(show_header=True, border_style="dim")
     table.add_column("#", style="bold yellow", width=3)
     table.add_column("Quality", style="white")
@@ -323,6 +469,78 @@ def select_save_location(default_path: str) -> str:
                 console.print(f"[red]Error creating directory: {e}[/red]")
 
 
+async def playlist_download_flow(url: str):
+    """Pick videos from a playlist and download them."""
+    console.print("\n[yellow]⏳ Fetching playlist...[/yellow]")
+
+    try:
+        with console.status("[bold yellow]Contacting YouTube..."):
+            entries = await YT_EXTRACTOR.extract_playlist_flat(url)
+    except Exception as e:
+        console.print(f"\n[bold red]❌ Error:[/bold red] {e}")
+        return
+
+    if not entries:
+        console.print("\n[bold red]❌ Could not find any videos in this playlist[/bold red]")
+        return
+
+    console.print()
+    display_playlist_info(entries)
+
+    selected = [entries[i] for i in select_playlist_entries(len(entries))]
+
+    # One video gets the full preview and format picker
+    if len(selected) == 1:
+        await video_download_flow(selected[0]['url'])
+        return
+
+    # Each download fetches its own metadata, so no separate probe is needed
+    if not Confirm.ask(f"Download {len(selected)} videos in best quality?", default=True):
+        console.print("[yellow]Download cancelled.[/yellow]")
+        return
+
+    save_dir = select_save_location(DEFAULT_DOWNLOAD_DIR)
+
+    console.print(f"\n[bold green]⬇️  Downloading {len(selected)} videos to: {save_dir}[/bold green]")
+    with console.status("[bold yellow]Downloading..."):
+        results = await download_batch([entry['url'] for entry in selected], save_dir)
+
+    console.print()
+    display_batch_results([entry.get('title') or entry['url'] for entry in selected], results)
+
+
+async def batch_download_flow():
+    """Download several pasted URLs at once."""
+    clear_screen()
+    print_banner()
+
+    console.print("[bold green]📎 Paste YouTube URLs, one per line. Leave a line empty to finish:[/bold green]")
+    urls = []
+    while True:
+        url = Prompt.ask(f"URL {len(urls) + 1}", default="", show_default=False).strip()
+        if not url:
+            break
+        if not is_youtube_url(url):
+            console.print("[red]Not a YouTube link, skipped.[/red]")
+            continue
+        urls.append(url)
+
+    if not urls:
+        console.print("[red]No URLs provided![/red]")
+        return
+
+    urls = list(await asyncio.gather(*(canonicalize(url) for url in urls)))
+
+    save_dir = select_save_location(DEFAULT_DOWNLOAD_DIR)
+
+    console.print(f"\n[bold green]⬇️  Downloading {len(urls)} videos to: {save_dir}[/bold green]")
+    with console.status("[bold yellow]Downloading..."):
+        results = await download_batch(urls, save_dir)
+
+    console.print()
+    display_batch_results(urls, results)
+
+
 async def main_download_flow():
     """Main download workflow."""
     clear_screen()
@@ -339,6 +557,15 @@ async def main_download_flow():
         console.print("[red]This tool only downloads from YouTube. Please paste a YouTube link.[/red]")
         return
 
+    if is_playlist_url(url) and Confirm.ask("This link is part of a playlist. Pick videos from the playlist?", default=True):
+        await playlist_download_flow(url)
+        return
+
+    await video_download_flow(await canonicalize(url))
+
+
+async def video_download_flow(url: str):
+    """Preview a single video, pick a format and download it."""
     console.print("\n[yellow]⏳ Fetching video information...[/yellow]")
 
     with console.status("[bold yellow]Contacting YouTube..."):
@@ -397,17 +624,18 @@ def list_downloads():
         console.print("[yellow]No downloaded files found.[/yellow]")
         return
 
+    from rich.table import Table
     table = Table(show_header=True, border_style="red")
     table.add_column("#", style="bold yellow", width=3)
     table.add_column("Filename", style="white")
     table.add_column("Size", style="green")
     table.add_column("Date", style="dim")
 
-    for i, filename in enumerate(sorted(files), 1):
-        filepath = os.path.join(DEFAULT_DOWNLOAD_DIR, filename)
-        size = format_size(os.path.getsize(filepath))
-        mtime = datetime.fromtimestamp(os.path.getmtime(filepath)).strftime("%Y-%m-%d %H:%M")
-        table.add_row(str(i), filename[:60], size, mtime)
+    for i, entry in enumerate(sorted(files, key=lambda e: e.name), 1):
+        stat = entry.stat()
+        size = format_size(stat.st_size)
+        mtime = datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
+        table.add_row(str(i), entry.name[:60], size, mtime)
 
     console.print(table)
     console.print(f"\n[dim]Location: {DEFAULT_DOWNLOAD_DIR}[/dim]")
@@ -426,16 +654,25 @@ def clear_downloads():
 
     console.print(f"[yellow]Found {len(files)} files to delete.[/yellow]")
     if Confirm.ask("[red]Delete all downloaded files?[/red]", default=False):
-        for f in files:
+        for entry in files:
             try:
-                os.remove(os.path.join(DEFAULT_DOWNLOAD_DIR, f))
+                os.remove(entry.path)
             except Exception as e:
-                console.print(f"[red]Error deleting {f}: {e}[/red]")
+                console.print(f"[red]Error deleting {entry.name}: {e}[/red]")
         console.print("[green]✅ Downloads cleared![/green]")
     else:
         console.print("[yellow]Cancelled.[/yellow]")
 
 
+def clear_metadata_cache():
+    """Clear cached video metadata."""
+    if Confirm.ask("[red]Clear cached video information?[/red]", default=False):
+        removed = YT_EXTRACTOR.clear_cache()
+        console.print(f"[green]✅ Metadata cache cleared ({removed} entries).[/green]")
+    else:
+        console.print("[yellow]Cancelled.[/yellow]")
+
+
 def show_main_menu():
     """Show the main menu."""
     clear_screen()
@@ -445,13 +682,15 @@ def show_main_menu():
 [bold red]Main Menu:[/bold red]
 
   [bold yellow]1.[/bold yellow] 📥 Download a YouTube video
-  [bold yellow]2.[/bold yellow] 📂 List downloaded files
-  [bold yellow]3.[/bold yellow] 🗑️  Clear downloads folder
-  [bold yellow]4.[/bold yellow] 🚪 Exit
+  [bold yellow]2.[/bold yellow] 📚 Batch download (multiple URLs)
+  [bold yellow]3.[/bold yellow] 📂 List downloaded files
+  [bold yellow]4.[/bold yellow] 🗑️  Clear downloads folder
+  [bold yellow]5.[/bold yellow] 🧹 Clear metadata cache
+  [bold yellow]6.[/bold yellow] 🚪 Exit
 
 """
     console.print(menu)
-    return Prompt.ask("[bold]Select option[/bold]", choices=["1", "2", "3", "4"], default="1")
+    return Prompt.ask("[bold]Select option[/bold]", choices=["1", "2", "3", "4", "5", "6"], default="1")
 
 
 async def main():
@@ -465,14 +704,22 @@ async def main():
                 console.print("\n[dim]Press Enter to continue...[/dim]")
                 input()
             elif choice == "2":
-                list_downloads()
+                await batch_download_flow()
                 console.print("\n[dim]Press Enter to continue...[/dim]")
                 input()
             elif choice == "3":
-                clear_downloads()
+                list_downloads()
                 console.print("\n[dim]Press Enter to continue...[/dim]")
                 input()
             elif choice == "4":
+                clear_downloads()
+                console.print("\n[dim]Press Enter to continue...[/dim]")
+                input()
+            elif choice == "5":
+                clear_metadata_cache()
+                console.print("\n[dim]Press Enter to continue...[/dim]")
+                input()
+            elif choice == "6":
                 clear_screen()
                 console.print("[bold red]👋 Goodbye![/bold red]")
                 break
@@ -480,7 +727,11 @@ async def main():
     except KeyboardInterrupt:
         clear_screen()
         console.print("\n[bold red]👋 Goodbye![/bold red]")
+    finally:
+        await close_http_session()
 
 
 if __name__ == "__main__":
+    # Batch worker processes are spawned; needed for the PyInstaller exe
+    multiprocessing.freeze_support()
     asyncio.run(main())